@@ -11,95 +11,108 @@ def analyze_keywords(text):
     Uses a RoBERTa-based transformer for more accurate sentiment classification.
     Extra fine-tuning has been added to handle common sentiment errors.
     """
-    try:
-        result = sentiment_model(text)
-        label = result[0]["label"]
-
-        # Convert model's output labels into positive, neutral, negative
-        if label == "negative":
-            sentiment = "negative"
-        elif label == "neutral":
-            sentiment = "neutral"
-        elif label == "positive":
-            sentiment = "positive"
-        else:
-            sentiment = "neutral"  # Default fallback
-
-        # ✅ Convert to lowercase for better matching
-        lower_text = text.lower()
-
-        # 🔴 PRIORITIZE NEGATIVE WORDS OVER POSITIVE IN MIXED CASES
-        negative_words = [
-            "violence",
-            "conflict",
-            "death",
-            "crisis",
-            "humiliation",
-            "deadly",
-            "attack",
-            "assault",
-            "killings",
-            "murder",
-            "disaster",
-            "scary",
-            "danger",
-            "terror",
-            "threat",
-            "catastrophe",
-            "fatal",
-        ]
-        positive_words = [
-            "growth",
-            "success",
-            "progress",
-            "peace",
-            "achievement",
-            "hope",
-        ]
-
-        has_negative = any(word in lower_text for word in negative_words)
-        has_positive = any(word in lower_text for word in positive_words)
-
-        # 🔴 If negative words are present, override model’s result to negative
-        if has_negative and not has_positive:
-            return {"final_sentiment": "negative"}
-
-        # ✅ If both negative and positive words exist, force neutral
-        if has_positive and has_negative:
-            return {"final_sentiment": "neutral"}
-
-        # ✅ Ensure neutral classification for mixed reactions
-        mixed_phrases = [
-            "mixed reactions",
-            "divided",
-            "controversy",
-            "debate",
-            "uncertain",
-            "not clear",
-            "question",
-            "skeptical",
-            "doubt",
-        ]
-        if any(phrase in lower_text for phrase in mixed_phrases):
-            return {"final_sentiment": "neutral"}
-
-        # ✅ Detect policy or factual statements → likely neutral
-        neutral_indicators = [
-            "policy",
-            "strategy",
-            "military strategy",
-            "economic policy",
-            "diplomatic talks",
-            "treaty",
-            "negotiation",
-            "agreement",
-            "trade policy",
-        ]
-        if any(word in lower_text for word in neutral_indicators) and not has_negative:
-            return {"final_sentiment": "neutral"}
-
-        return {"final_sentiment": sentiment}
+    return analyze_keywords_batch([text])[0]
+
 
+def analyze_keywords_batch(texts, batch_size=32):
+    """
+    Classifies a list of texts in one batched model call instead of one
+    model invocation per text, then applies the keyword fine-tuning rules
+    to each result. Returns one sentiment dict per input, aligned by index.
+    """
+    try:
+        results = sentiment_model(list(texts), batch_size=batch_size)
+        labels = [result["label"] for result in results]
     except Exception as e:
         print(f"❌ Sentiment analysis failed: {e}")
+        return [{"final_sentiment": "neutral"} for _ in texts]
+
+    return [_refine_sentiment(text, label) for text, label in zip(texts, labels)]
+
+
+def _refine_sentiment(text, label):
+    """Applies the keyword fine-tuning rules on top of the model's label."""
+    # Convert model's output labels into positive, neutral, negative
+    if label == "negative":
+        sentiment = "negative"
+    elif label == "neutral":
+        sentiment = "neutral"
+    elif label == "positive":
+        sentiment = "positive"
+    else:
+        sentiment = "neutral"  # Default fallback
+
+    # ✅ Convert to lowercase for better matching
+    lower_text = text.lower()
+
+    # 🔴 PRIORITIZE NEGATIVE WORDS OVER POSITIVE IN MIXED CASES
+    negative_words = [
+        "violence",
+        "conflict",
+        "death",
+        "crisis",
+        "humiliation",
+        "deadly",
+        "attack",
+        "assault",
+        "killings",
+        "murder",
+        "disaster",
+        "scary",
+        "danger",
+        "terror",
+        "threat",
+        "catastrophe",
+        "fatal",
+    ]
+    positive_words = [
+        "growth",
+        "success",
+        "progress",
+        "peace",
+        "achievement",
+        "hope",
+    ]
+
+    has_negative = any(word in lower_text for word in negative_words)
+    has_positive = any(word in lower_text for word in positive_words)
+
+    # 🔴 If negative words are present, override model’s result to negative
+    if has_negative and not has_positive:
+        return {"final_sentiment": "negative"}
+
+    # ✅ If both negative and positive words exist, force neutral
+    if has_positive and has_negative:
         return {"final_sentiment": "neutral"}
+
+    # ✅ Ensure neutral classification for mixed reactions
+    mixed_phrases = [
+        "mixed reactions",
+        "divided",
+        "controversy",
+        "debate",
+        "uncertain",
+        "not clear",
+        "question",
+        "skeptical",
+        "doubt",
+    ]
+    if any(phrase in lower_text for phrase in mixed_phrases):
+        return {"final_sentiment": "neutral"}
+
+    # ✅ Detect policy or factual statements → likely neutral
+    neutral_indicators = [
+        "policy",
+        "strategy",
+        "military strategy",
+        "economic policy",
+        "diplomatic talks",
+        "treaty",
+        "negotiation",
+        "agreement",
+        "trade policy",
+    ]
+    if any(word in lower_text for word in neutral_indicators) and not has_negative:
+        return {"final_sentiment": "neutral"}
+
+    return {"final_sentiment": sentiment}
@@ -1,23 +1,87 @@
-import json
-import requests
-import time
+import asyncio
+import hashlib
 import unicodedata
 import re
 import traceback
 import datetime
-from lxml import html
-from transformers import pipeline
-from selector_scraper import scrape_static_website, scrape_dynamic_website
-from feed_data import analyze_keywords
+import aiohttp
+import diskcache
+import orjson
+import requests
+from lxml import etree, html
+import torch
+from transformers import AutoTokenizer, T5ForConditionalGeneration
+from selector_scraper import (
+    filter_results,
+    scrape_static_website,
+    scrape_dynamic_website,
+)
+from feed_data import analyze_keywords_batch
 from save2db import save_articles_to_db
 import ftfy
 
 # Load news site configurations
-with open("news_sites.json", "r", encoding="utf-8") as file:
-    WEBSITE_CONFIG = json.load(file)
+with open("news_sites.json", "rb") as file:
+    WEBSITE_CONFIG = orjson.loads(file.read())
+
+# ✅ Regexes used on every article, compiled once at import time
+_CONTRACT_RE = re.compile(r"\b([A-Za-z]+)\s([smtdl])\b")
+_WS_RE = re.compile(r"\s+")
+_PUNCT_SPACE_RE = re.compile(r"\s([.,!?;:])")
+_CAP_RE = re.compile(r"(^|[.!?]\s+)([a-z])")
+# Any mixed run of non-ASCII and whitespace becomes a single space, in one scan
+_NONASCII_WS_RE = re.compile(r"(?:[^\x00-\x7F]|\s)+")
+
+# ✅ XPath expressions compiled once instead of re-parsed on every page
+_P_XPATH = etree.XPath("//p")
+_OG_IMAGE_XPATH = etree.XPath("//meta[@property='og:image']/@content")
+_TWITTER_IMAGE_XPATH = etree.XPath("//meta[@name='twitter:image']/@content")
+_ARTICLE_IMG_XPATH = etree.XPath("//article//img/@src")
+_IMG_XPATH = etree.XPath("//img/@src")
+
+# ✅ Disk cache so re-runs skip refetching pages and resummarizing content
+CACHE = diskcache.Cache("./.scrape_cache")
+CACHE_EXPIRE = 86400  # Cache entries for one day
+
+
+# Headers for article fetches
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Referer": "https://www.google.com/",
+}
+
+
+# ✅ T5 Summarization Model, loaded lazily on first use
+_SUMMARIZER = None
+
+
+def get_summarizer():
+    """Loads the T5 models and tokenizer on first use and caches them.
+
+    Keeps the multi-GB weights out of memory until something actually needs
+    summarizing, e.g. runs where every summary comes from the disk cache.
+    """
+    global _SUMMARIZER
+    if _SUMMARIZER is None:
+        tokenizer = AutoTokenizer.from_pretrained("t5-large")
+        model = T5ForConditionalGeneration.from_pretrained("t5-large")
+        model.config.use_cache = True  # ✅ Keep the KV cache across decoder steps
+
+        # ✅ Run FP16 on a CUDA device when present; otherwise quantize the
+        # linear layers to int8 for faster CPU inference
+        if torch.cuda.is_available():
+            device = torch.device("cuda")
+            model = model.half().to(device)
+        else:
+            device = torch.device("cpu")
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
 
-# Load the T5 Summarization Model
-summarizer = pipeline("summarization", model="t5-large")
+        _SUMMARIZER = (tokenizer, model, device)
+
+    return _SUMMARIZER
 
 
 # ✅ Fix Encoding Issues & Normalize Text
@@ -25,11 +89,9 @@ def clean_text(text):
     """Fixes text encoding issues, normalizes text properly."""
     try:
         text = unicodedata.normalize("NFKC", text)
-        text = text.encode("utf-8", "ignore").decode("utf-8")
         text = ftfy.fix_text(text)  # Fix encoding issues
-        text = re.sub(r"\b([A-Za-z]+)\s([smtdl])\b", r"\1'\2", text)
-        text = re.sub(r"[^\x00-\x7F]+", " ", text)
-        text = re.sub(r"\s+", " ", text).strip()
+        text = _CONTRACT_RE.sub(r"\1'\2", text)
+        text = _NONASCII_WS_RE.sub(" ", text).strip()
         return text
     except Exception as e:
         print(f"❌ Error cleaning text: {e}")
@@ -43,26 +105,24 @@ def fix_guardian_link(link):
     return link
 
 
+# ✅ Keywords marking non-article headlines, scanned in one compiled pass
+_UNWANTED_HEADLINE_RE = re.compile(
+    r"advertisement|sponsored|opinion|op-ed|video|watch now", re.IGNORECASE
+)
+
+
 # ✅ Filter Out Non-Article Headlines
 def filter_headlines(headlines):
     """Filters out unwanted headlines."""
     filtered = []
-    unwanted_keywords = [
-        "advertisement",
-        "sponsored",
-        "opinion",
-        "op-ed",
-        "video",
-        "watch now",
-    ]
 
     for headline in headlines:
         cleaned_headline = clean_text(headline)
-        if len(cleaned_headline.split()) <= 2:
+        if cleaned_headline.count(" ") < 2:
             continue  # Skip very short headlines
 
         # Skip unwanted content
-        if any(word in cleaned_headline.lower() for word in unwanted_keywords):
+        if _UNWANTED_HEADLINE_RE.search(cleaned_headline):
             continue
 
         filtered.append(cleaned_headline)
@@ -74,17 +134,17 @@ def extract_image(tree):
     """Extracts the first available image from the article page."""
     try:
         # Try extracting from OpenGraph metadata (most reliable)
-        img_url = tree.xpath("//meta[@property='og:image']/@content")
+        img_url = _OG_IMAGE_XPATH(tree)
         if img_url:
             return img_url[0]
 
         # Try extracting from Twitter Card metadata
-        twitter_img = tree.xpath("//meta[@name='twitter:image']/@content")
+        twitter_img = _TWITTER_IMAGE_XPATH(tree)
         if twitter_img:
             return twitter_img[0]
 
         # Fallback: Extract from <img> tags inside article content
-        img_tags = tree.xpath("//article//img/@src") or tree.xpath("//img/@src")
+        img_tags = _ARTICLE_IMG_XPATH(tree) or _IMG_XPATH(tree)
         for img in img_tags:
             if img.startswith("http"):  # Ensure absolute URL
                 return img
@@ -95,40 +155,102 @@ def extract_image(tree):
         return None
 
 
-# ✅ Fetch Full Article Content & Image
-def fetch_full_article(url):
-    """Fetches the full content and image of an article given its URL."""
-    HEADERS = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Referer": "https://www.google.com/",
-    }
+# ✅ Scrape Sites Exposing an RSS Feed
+def scrape_rss_feed(rss_url):
+    """Fetches an RSS feed, returning headline/link/description entries in one trip."""
     try:
-        session = requests.Session()
-        response = session.get(url, headers=HEADERS)
+        response = requests.get(rss_url, headers=HEADERS, timeout=10)
+        response.raise_for_status()
+        tree = etree.fromstring(response.content)
+
+        results = []
+        for item in tree.iter("item"):
+            headline = (item.findtext("title") or "").strip()
+            link = (item.findtext("link") or "").strip()
+            description = (item.findtext("description") or "").strip()
+            if description:
+                # Descriptions often carry markup; keep only the text
+                description = html.fromstring(description).text_content().strip()
+
+            if headline and link:
+                results.append(
+                    {"headline": headline, "link": link, "description": description}
+                )
+
+        return filter_results(results)
+    except Exception as e:
+        print(f"❌ Error fetching RSS feed {rss_url}: {e}")
+        return []
 
-        # Handle 403 Forbidden by retrying
-        if response.status_code == 403:
-            print(f"⚠️ Warning: Access denied for {url}. Trying alternative method...")
-            time.sleep(2)
-            response = session.get(url, headers=HEADERS, cookies=session.cookies)
 
-        response.raise_for_status()
-        tree = html.fromstring(response.content)
+# ✅ Fetch Full Article Content & Image
+async def fetch_full_article(session, url):
+    """Fetches the full content and image of an article given its URL."""
+    cache_key = "page:" + hashlib.blake2b(url.encode()).hexdigest()
+    cached = CACHE.get(cache_key)
+    if cached is not None:
+        return cached
 
-        # Extract main article text
-        paragraphs = tree.xpath("//p/text()")
-        content = " ".join(paragraphs).strip()
+    try:
+        async with session.get(url) as response:
+            if response.status != 403:
+                return await read_article_response(response, cache_key)
 
-        # Extract image if available
-        image_url = extract_image(tree)
+            # Handle 403 Forbidden by retrying on the same pooled session
+            print(f"⚠️ Warning: Access denied for {url}. Trying alternative method...")
+            await asyncio.sleep(2)
 
-        return content if content else "Content not available", image_url
+        async with session.get(url) as response:
+            return await read_article_response(response, cache_key)
     except Exception as e:
         print(f"❌ Error fetching article from {url}: {e}")
         return "Content not available", None
 
 
+async def read_article_response(response, cache_key):
+    """Parses an article response and caches it on disk when content was found."""
+    response.raise_for_status()
+    content, image_url = parse_article_page(await stream_into_tree(response))
+    if content != "Content not available":
+        CACHE.set(cache_key, (content, image_url), expire=CACHE_EXPIRE)
+    return content, image_url
+
+
+async def stream_into_tree(response):
+    """Feeds response chunks straight into lxml without buffering the full body."""
+    parser = html.HTMLParser()
+    async for chunk in response.content.iter_chunked(65536):
+        parser.feed(chunk)
+    return parser.close()
+
+
+def parse_article_page(tree):
+    """Extracts the text content and image URL from a parsed article page."""
+    # Extract main article text, including text nested inside links and spans
+    paragraphs = _P_XPATH(tree)
+    content = " ".join(p.text_content() for p in paragraphs).strip()
+
+    # Extract image if available
+    image_url = extract_image(tree)
+
+    return content if content else "Content not available", image_url
+
+
+# ✅ Fetch All Articles Concurrently
+async def fetch_all_articles(articles):
+    """Fetches every article concurrently over one pooled aiohttp session."""
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=4, ttl_dns_cache=300)
+    # Per-socket timeouts: a total= budget would also count time queued for a
+    # connector slot, killing healthy fetches whenever one host has many links
+    timeout = aiohttp.ClientTimeout(sock_connect=10, sock_read=10)
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=timeout, headers=HEADERS
+    ) as session:
+        return await asyncio.gather(
+            *(fetch_full_article(session, a["link"]) for a in articles)
+        )
+
+
 def clean_summary(text):
     """Cleans up summary text, ensuring proper capitalization, punctuation, and encoding."""
     try:
@@ -145,13 +267,11 @@ def clean_summary(text):
         text = text.replace("â€˜", "'").replace("â€™", "'")  # Fix single quotes
 
         # ✅ Fix spacing issues with punctuation
-        text = re.sub(r"\s+", " ", text)  # Remove excessive spaces
-        text = re.sub(r"\s([.,!?;:])", r"\1", text)  # Remove space before punctuation
+        text = _WS_RE.sub(" ", text)  # Remove excessive spaces
+        text = _PUNCT_SPACE_RE.sub(r"\1", text)  # Remove space before punctuation
 
         # ✅ Capitalize the first letter of every sentence
-        text = re.sub(
-            r"(^|[.!?]\s+)([a-z])", lambda m: m.group(1) + m.group(2).upper(), text
-        )
+        text = _CAP_RE.sub(lambda m: m.group(1) + m.group(2).upper(), text)
 
         # ✅ Ensure summary ends properly with a period
         if text and text[-1] not in ".!?":
@@ -164,98 +284,196 @@ def clean_summary(text):
 
 
 # ✅ Adjust `max_length` for Summarization
-def generate_summary(text):
-    """Generates a cleaned and formatted summary using Hugging Face's T5 model."""
-    try:
+def generate_summaries(texts):
+    """Generates cleaned and formatted summaries for a batch of texts using T5.
+
+    Runs the summarizer once over the whole batch instead of once per article,
+    so the model processes a padded batch in a single forward pass. Texts too
+    short to summarize are kept out of the batch and returned as-is.
+    """
+    summaries = [None] * len(texts)
+    batch_inputs = []
+    batch_indices = []
+    batch_keys = []
+
+    for i, text in enumerate(texts):
         if not isinstance(text, str):
             text = str(text)  # Force conversion to string
 
         text = text.strip()
         if not text:
-            return "No content available to summarize."
-
-        input_length = len(text.split())
-        if input_length < 10:
-            return text.capitalize()
+            summaries[i] = "No content available to summarize."
+            continue
 
-        input_text = "summarize: " + text[:2048]
-        summary = summarizer(input_text, max_length=150, min_length=50, do_sample=False)
+        # Guard short inputs out of the batch so batch tensors stay uniform
+        if len(text.split()) < 10:
+            summaries[i] = text.capitalize()
+            continue
 
-        cleaned_summary = clean_summary(summary[0]["summary_text"])
-        return cleaned_summary
+        # ✅ Key by content hash so identical articles reuse a cached summary
+        cache_key = "summary:" + hashlib.blake2b(text.encode()).hexdigest()
+        cached = CACHE.get(cache_key)
+        if cached is not None:
+            summaries[i] = cached
+            continue
 
-    except Exception as e:
-        print(f"❌ Error generating summary: {e}")
-        print(traceback.format_exc())
-        return clean_summary(text[:300] + "...")
+        batch_inputs.append("summarize: " + text)
+        batch_indices.append(i)
+        batch_keys.append(cache_key)
+
+    if batch_inputs:
+        try:
+            tokenizer, model, device = get_summarizer()
+            batch_summaries = []
+            for start in range(0, len(batch_inputs), 8):
+                # ✅ Truncate at T5's 512-token encoder limit, not a character count
+                inputs = tokenizer(
+                    batch_inputs[start : start + 8],
+                    return_tensors="pt",
+                    padding=True,
+                    truncation=True,
+                    max_length=512,
+                ).to(device)
+                # ✅ Greedy decoding with the KV cache: one beam, no sampling.
+                # generate runs the encoder once per batch on its own; its
+                # outputs are then reused by every decoder step
+                output_ids = model.generate(
+                    inputs["input_ids"],
+                    attention_mask=inputs["attention_mask"],
+                    max_new_tokens=150,
+                    min_new_tokens=50,
+                    num_beams=1,
+                    do_sample=False,
+                    use_cache=True,
+                )
+                batch_summaries.extend(
+                    tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+                )
+            for i, cache_key, summary in zip(
+                batch_indices, batch_keys, batch_summaries
+            ):
+                summaries[i] = clean_summary(summary)
+                CACHE.set(cache_key, summaries[i], expire=CACHE_EXPIRE)
+        except Exception as e:
+            print(f"❌ Error generating summaries: {e}")
+            print(traceback.format_exc())
+            for i in batch_indices:
+                summaries[i] = clean_summary(str(texts[i])[:300] + "...")
+
+    return summaries
 
 
 # ✅ Sentiment Analysis & Processing
 def process_news():
     """Scrapes headlines, fetches full articles, analyzes sentiment, and organizes results."""
     results = {"positive": [], "neutral": [], "negative": []}
+    pending_articles = []  # Articles awaiting batch summarization
+
+    # ✅ One timestamp per run; articles scraped together share it
+    run_timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
 
     for site, config in WEBSITE_CONFIG.items():
         print(f"📰 Scraping: {site}")
-        base_url = config["base_url"]
-        headline_xpath = config["headline_xpath"]
-        link_xpath = config["link_xpath"]
 
-        # Choose dynamic or static scraping
-        if config["dynamic"]:
-            articles = scrape_dynamic_website(base_url, headline_xpath, link_xpath)
+        # Prefer an RSS feed when configured: one fetch covers the whole site
+        if config.get("rss_url"):
+            articles = scrape_rss_feed(config["rss_url"])
         else:
-            articles = scrape_static_website(base_url, headline_xpath, link_xpath)
+            base_url = config["base_url"]
+            headline_xpath = config["headline_xpath"]
+            link_xpath = config["link_xpath"]
+
+            # Choose dynamic or static scraping
+            if config["dynamic"]:
+                articles = scrape_dynamic_website(base_url, headline_xpath, link_xpath)
+            else:
+                articles = scrape_static_website(base_url, headline_xpath, link_xpath)
+
+        # ✅ Resolve the link fixer once per site instead of per article
+        link_fixer = fix_guardian_link if site == "guardian" else (lambda link: link)
 
         seen_articles = set()
         filtered_articles = []
         for a in articles:
             cleaned_headline = clean_text(a["headline"])
-            cleaned_link = (
-                fix_guardian_link(a["link"]) if site == "guardian" else a["link"]
-            )
+            cleaned_link = link_fixer(a["link"])
 
             if cleaned_link in seen_articles:
                 continue
 
             seen_articles.add(cleaned_link)
             filtered_articles.append(
-                {"headline": cleaned_headline, "link": cleaned_link}
+                {
+                    "headline": cleaned_headline,
+                    "link": cleaned_link,
+                    "description": a.get("description", ""),
+                }
+            )
+
+        # ✅ Long RSS descriptions are already summarizable; skip those fetches
+        to_fetch = [a for a in filtered_articles if len(a["description"]) <= 200]
+
+        # ✅ Fetch articles concurrently; the connector handles per-host pacing
+        fetched = dict(
+            zip(
+                (a["link"] for a in to_fetch),
+                asyncio.run(fetch_all_articles(to_fetch)),
             )
+        )
 
         for article in filtered_articles:
-            headline = clean_text(article["headline"])
+            headline = article["headline"]  # Already cleaned when filtered
             url = article["link"]
 
-            print(f"🔍 Fetching article: {headline} ({url})")
-            full_content, image_url = fetch_full_article(url)
+            if url in fetched:
+                full_content, image_url = fetched[url]
+            else:
+                full_content, image_url = clean_text(article["description"]), None
+
+            print(f"🔍 Fetched article: {headline} ({url})")
 
             if full_content == "Content not available":
                 continue
 
-            sentiment_response = analyze_keywords(headline)
-            sentiment = sentiment_response.get("final_sentiment", "neutral")
-
-            summary = generate_summary(full_content)
-
-            article_data = {
-                "headline": headline,
-                "url": url,
-                "sentiment": sentiment,
-                "summary": summary,
-                "image": image_url,
-                "timestamp": datetime.datetime.now(
-                    datetime.timezone.utc
-                ).isoformat(),  # ✅ Timestamp for sorting
-            }
-
-            results[sentiment].append(article_data)
-            print(f"{sentiment.capitalize()}: {headline}")
-
-            time.sleep(2)  # Add a short delay to prevent rate limiting
+            pending_articles.append(
+                {
+                    "headline": headline,
+                    "url": url,
+                    "full_content": full_content,
+                    "image": image_url,
+                }
+            )
 
-    with open("sentiment_results.json", "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=4, default=str)  # ✅ Convert datetime to string
+    # ✅ Classify every headline in one batched model pass
+    sentiments = analyze_keywords_batch([a["headline"] for a in pending_articles])
+    for article, sentiment_response in zip(pending_articles, sentiments):
+        article["sentiment"] = sentiment_response.get("final_sentiment", "neutral")
+        print(f"{article['sentiment'].capitalize()}: {article['headline']}")
+
+    # ✅ Summarize in batches of 8 and append each batch to the JSON Lines log
+    # as soon as it is produced, so a crash mid-summarization only loses the
+    # batch in flight. The log is append-only across runs; downstream readers
+    # should deduplicate on (url, timestamp).
+    with open("sentiment_results.jsonl", "ab") as stream:
+        for start in range(0, len(pending_articles), 8):
+            batch = pending_articles[start : start + 8]
+            summaries = generate_summaries([a["full_content"] for a in batch])
+
+            for article, summary in zip(batch, summaries):
+                article_data = {
+                    "headline": article["headline"],
+                    "url": article["url"],
+                    "sentiment": article["sentiment"],
+                    "summary": summary,
+                    "image": article["image"],
+                    "timestamp": run_timestamp,  # ✅ Timestamp for sorting
+                }
+                results[article["sentiment"]].append(article_data)
+                stream.write(orjson.dumps(article_data) + b"\n")
+            stream.flush()
+
+    with open("sentiment_results.json", "wb") as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
 
     print("\n✅ Sentiment Analysis Complete! Results saved in `sentiment_results.json`")
 